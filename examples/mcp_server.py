@@ -1,10 +1,16 @@
+import asyncio
+import functools
+import itertools
 import json
 import os
 import shutil
-import subprocess
-import tempfile
 import sys
-from typing import Optional, List, Dict, Any, Tuple
+
+try:
+    import fcntl  # Linux/macOS only; used for F_SETPIPE_SZ below
+except ImportError:
+    fcntl = None
+from typing import Callable, Optional, List, Dict, Any, Sequence, Tuple
 
 # Try to import FastMCP. If not installed, print a friendly error
 try:
@@ -13,37 +19,149 @@ except ImportError:
     print("Error: 'mcp' package not found. Install it with: uv add 'mcp[cli]'", file=sys.stderr)
     sys.exit(1)
 
+# orjson parses NDJSON bytes several times faster than stdlib json,
+# but it is optional; fall back to json.loads on str if unavailable
+try:
+    import orjson
+
+    def _loads(line: bytes) -> Any:
+        return orjson.loads(line)
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _loads(line: bytes) -> Any:
+        return json.loads(line)
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
 mcp = FastMCP("txed-tools")
 
-TXED_BINARY = "txed"  # ensure this is in PATH or set to an absolute path
+# Either a name resolvable via PATH or an absolute path;
+# override with the TXED_BINARY environment variable
+TXED_BINARY = os.environ.get("TXED_BINARY", "txed")
 
 
+@functools.lru_cache(maxsize=1)
 def _resolve_txed() -> Optional[str]:
-    # Allows either absolute path or PATH lookup
+    # Allows either absolute path or PATH lookup.
+    # Cached: TXED_BINARY and $PATH are constant for the server's
+    # lifetime, so there is no point re-statting $PATH per tool call.
     if os.path.isabs(TXED_BINARY):
         return TXED_BINARY if os.path.exists(TXED_BINARY) else None
     return shutil.which(TXED_BINARY)
 
 
-def _run_process(argv: List[str], input_data: Optional[str]) -> Tuple[int, str, str]:
-    proc = subprocess.Popen(
-        argv,
-        stdin=subprocess.PIPE if input_data is not None else None,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
+# Resolved once at import so the dispatch path does no path checks at
+# all; if the binary is absent every tool call reports it immediately
+_TXED_PATH = _resolve_txed()
+# '--format=json' must precede the args: tool args start with '--', and
+# anything after that separator is taken as a positional FIND/REPLACE/file
+_ARGV_PREFIX = (_TXED_PATH, "--format=json") if _TXED_PATH else ()
+
+# txed serializes file events with the type field first, so skipped
+# events — which we discard anyway — can be recognized by exact prefix
+# without parsing. Set TXED_SKIP_PREFILTER=0 to disable the fast path.
+_SKIP_PREFIX = b'{"file":{"type":"skipped"'
+_SKIP_PREFILTER = os.environ.get("TXED_SKIP_PREFILTER", "1") != "0"
+
+# Every legal flag combination for txed_replace, precomputed so per-call
+# dispatch is a single dict lookup instead of four append branches.
+# Keyed by (regex, word_regexp, fixed_strings, dry_run).
+_FLAG_TABLE: Dict[Tuple[bool, bool, bool, bool], Tuple[str, ...]] = {}
+for _regex, _word, _fixed, _dry in itertools.product((False, True), repeat=4):
+    _flags = []
+    if _fixed:
+        _flags.append("--fixed-strings")
+    elif _regex:
+        _flags.append("--regex")
+    if _word:
+        _flags.append("--word-regexp")
+    if _dry:
+        _flags.append("--dry-run")
+    _FLAG_TABLE[(_regex, _word, _fixed, _dry)] = tuple(_flags)
+
+# Events are parsed this many lines at a time, wrapped as one JSON array,
+# to amortize the fixed per-call cost of the parser (which dominates for
+# tiny events when stdlib json is the backend). Typical file events are
+# well under 1 KiB, so a batch stays comfortably cache-sized.
+_BATCH_SIZE = 256
+
+
+async def _read_stream(
+    stream: asyncio.StreamReader, on_line: Callable[[bytes], None]
+) -> None:
+    async for line in stream:
+        on_line(line)
+
+
+async def _run_process(
+    argv: Sequence[str], input_data: Optional[bytes], on_line: Callable[[bytes], None]
+) -> Tuple[int, str]:
+    """
+    Spawn argv and invoke on_line for each raw stdout line as it arrives,
+    instead of buffering the whole NDJSON stream in memory.
+    Pipes stay in binary mode so no per-byte UTF-8 decode or newline
+    translation happens before JSON parsing. Returns (returncode, stderr).
+
+    Runs on the event loop so concurrent tool calls overlap child
+    execution instead of serializing behind a blocking communicate().
+    """
+    # Keep the spawn arguments minimal: no preexec_fn, cwd, env override,
+    # or pass_fds. That keeps CPython on its vfork/posix_spawn fast paths,
+    # so spawn latency stays flat instead of scaling with the size of this
+    # process's heap (fork must duplicate the parent's page tables).
+    proc = await asyncio.create_subprocess_exec(
+        *argv,
+        stdin=asyncio.subprocess.PIPE if input_data is not None else None,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=1 << 20,
     )
-    stdout, stderr = proc.communicate(input=input_data)
-    return proc.returncode, stdout, stderr
 
+    # Reads on our side are already buffered (the event loop pulls 64 KiB
+    # chunks into the StreamReader); additionally grow the kernel pipe
+    # behind stdout so txed can burst-write NDJSON without blocking while
+    # we are still parsing earlier lines. Best-effort, Linux only.
+    if fcntl is not None and hasattr(fcntl, "F_SETPIPE_SZ"):
+        try:
+            pipe = proc._transport.get_pipe_transport(1).get_extra_info("pipe")
+            fcntl.fcntl(pipe.fileno(), fcntl.F_SETPIPE_SZ, 1 << 20)
+        except (AttributeError, ValueError, OSError):
+            pass
+
+    stderr_chunks: List[bytes] = []
+
+    async def feed_stdin() -> None:
+        try:
+            proc.stdin.write(input_data)
+            await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        proc.stdin.close()
+
+    # One reader task per pipe: if either stdout or stderr were left
+    # unread past the ~64 KiB pipe capacity, the child would block on
+    # write and the whole run would stall.
+    writers = [feed_stdin()] if input_data is not None else []
+    await asyncio.gather(
+        _read_stream(proc.stdout, on_line),
+        _read_stream(proc.stderr, stderr_chunks.append),
+        *writers,
+    )
 
-def run_txed_command(args: List[str], input_data: Optional[str] = None) -> str:
+    rc = await proc.wait()
+    # Decode stderr once at the end rather than per-chunk
+    return rc, b"".join(stderr_chunks).decode("utf-8", "replace")
+
+
+async def run_txed_command(args: List[str], input_data: Optional[bytes] = None) -> str:
     """
     Run txed and summarize its NDJSON output for an LLM.
     Always forces JSON output and returns a human-readable summary.
     """
-    txed_path = _resolve_txed()
-    if not txed_path:
+    if not _ARGV_PREFIX:
         return (
             f"Error: '{TXED_BINARY}' not found.\n"
             "Install txed or set TXED_BINARY to an absolute path."
@@ -51,84 +169,121 @@ def run_txed_command(args: List[str], input_data: Optional[str] = None) -> str:
 
     # Force JSON format for reliable parsing
     # Include '--' to prevent patterns starting with '-' from being parsed as flags
-    argv = [txed_path] + args + ["--format=json"]
-
-    rc, stdout, stderr = _run_process(argv, input_data=input_data)
+    argv = _ARGV_PREFIX + tuple(args)
 
     modified_files: List[str] = []
     errors: List[str] = []
     non_json_lines: List[str] = []
 
-    for line in stdout.splitlines():
-        if not line.strip():
-            continue
+    # Pre-bound for the hot loop: skips a LOAD_ATTR per event
+    modified_append = modified_files.append
+    errors_append = errors.append
 
-        try:
-            event = json.loads(line)
-        except json.JSONDecodeError:
-            non_json_lines.append(line)
-            continue
+    batch: List[bytes] = []
+    batch_append = batch.append
 
-        if "file" in event:
-            data = event["file"]
-            path = data.get("path", "<unknown>")
+    def handle_line(line: bytes) -> None:
+        # Lines from the stream keep their trailing newline; a blank line
+        # is exactly that byte, so a length check replaces the per-line strip
+        if len(line) <= 1:
+            return
 
-            if data.get("type") == "success":
+        # Skipped events can dominate the stream on large trees;
+        # short-circuit them before paying for a JSON parse
+        if _SKIP_PREFILTER and line.startswith(_SKIP_PREFIX):
+            return
+
+        batch_append(line)
+        if len(batch) >= _BATCH_SIZE:
+            flush_batch()
+
+    def flush_batch() -> None:
+        if not batch:
+            return
+        try:
+            events = _loads(b"[" + b",".join(batch) + b"]")
+        except ValueError:
+            # Some line in the batch is malformed; re-parse individually
+            # so only the bad line lands in diagnostics
+            events = []
+            for raw in batch:
+                try:
+                    events.append(_loads(raw))
+                except ValueError:
+                    non_json_lines.append(raw.decode("utf-8", "replace").rstrip("\n"))
+        batch.clear()
+        for event in events:
+            handle_event(event)
+
+    def handle_event(event: Dict[str, Any]) -> None:
+        data = event.get("file")
+        if data is not None:
+            # Key the event type once instead of re-probing per branch,
+            # and only look up path/message for events we actually report
+            kind = data.get("type")
+
+            if kind == "success":
                 if data.get("modified"):
+                    path = data.get("path", "<unknown>")
                     reps = data.get("replacements", 0)
-                    modified_files.append(f"{path} ({reps} replacements)")
+                    modified_append(f"{path} ({reps} replacements)")
 
-            elif data.get("type") == "error":
+            elif kind == "error":
+                path = data.get("path", "<unknown>")
                 msg = data.get("message", "unknown error")
                 code = data.get("code")
                 if code:
-                    errors.append(f"{path}: {code}: {msg}")
+                    errors_append(f"{path}: {code}: {msg}")
                 else:
-                    errors.append(f"{path}: {msg}")
+                    errors_append(f"{path}: {msg}")
 
-            elif data.get("type") == "skipped":
-                # keep it quiet by default
-                pass
+            # "skipped" events are intentionally quiet
+            return
 
-        elif "run_end" in event:
-            data = event["run_end"]
+        data = event.get("run_end")
+        if data is not None:
             pv = data.get("policy_violation")
             if pv:
-                errors.append(f"Policy violation: {pv}")
+                errors_append(f"Policy violation: {pv}")
+
+    rc, stderr = await _run_process(argv, input_data=input_data, on_line=handle_line)
+    flush_batch()  # parse whatever arrived after the last full batch
 
-    out: List[str] = []
+    # Assemble the summary as a chain of small iterables so the per-line
+    # f-strings are produced lazily inside the single join pass, instead
+    # of materializing an intermediate list of formatted lines
+    sections: List[Any] = []
 
     if modified_files:
-        out.append("### Successfully modified")
-        out.extend(f"- {m}" for m in modified_files)
+        sections.append(("### Successfully modified",))
+        sections.append(f"- {m}" for m in modified_files)
     else:
-        out.append("No files were modified")
+        sections.append(("No files were modified",))
 
     if errors:
-        out.append("\n### Errors")
-        out.extend(f"- {e}" for e in errors)
+        sections.append(("\n### Errors",))
+        sections.append(f"- {e}" for e in errors)
 
     # If txed exited nonzero but didn't emit a structured error, surface that
     if rc != 0 and not errors:
-        out.append(f"\n### Exit status\n- txed exited with code {rc}")
+        sections.append((f"\n### Exit status\n- txed exited with code {rc}",))
 
     if non_json_lines:
         # This should not happen under --format=json, but if it does,
         # surface it as diagnostics instead of silently discarding
-        out.append("\n### Diagnostics (non-JSON stdout)")
-        out.extend(f"- {ln}" for ln in non_json_lines[:50])
+        sections.append(("\n### Diagnostics (non-JSON stdout)",))
+        sections.append(f"- {ln}" for ln in non_json_lines[:50])
         if len(non_json_lines) > 50:
-            out.append(f"- (truncated, {len(non_json_lines) - 50} more lines)")
+            sections.append((f"- (truncated, {len(non_json_lines) - 50} more lines)",))
 
     if stderr.strip():
-        out.append("\n### Stderr")
-        out.append(stderr)
+        sections.append(("\n### Stderr", stderr))
 
-    return "\n".join(out)
+    return "\n".join(itertools.chain.from_iterable(sections))
 
 
 @mcp.tool()
-def txed_replace(
+async def txed_replace(
     find: str,
     replace: str,
     files: List[str],
@@ -144,44 +299,27 @@ def txed_replace(
         # If txed supports both, you can drop this, but most tools treat these as mutually exclusive
         return "Error: 'fixed_strings' and 'regex' cannot both be true"
 
-    args = ["--", find, replace] + files
+    # Flags must precede '--': everything after the separator is a
+    # positional FIND/REPLACE/file (a trailing --dry-run would be read
+    # as a file name and the dry run silently ignored)
+    flags = _FLAG_TABLE[(regex, word_regexp, fixed_strings, dry_run)]
+    args = [*flags, "--", find, replace, *files]
 
-    if fixed_strings:
-        args.append("--fixed-strings")
-    elif regex:
-        args.append("--regex")
-
-    if word_regexp:
-        args.append("--word-regexp")
-
-    if dry_run:
-        args.append("--dry-run")
-
-    return run_txed_command(args)
+    return await run_txed_command(args)
 
 
 @mcp.tool()
-def txed_apply(manifest: Dict[str, Any], dry_run: bool = False) -> str:
+async def txed_apply(manifest: Dict[str, Any], dry_run: bool = False) -> str:
     """
     Apply a manifest describing multi-file operations.
+    The manifest is streamed to txed over stdin ('--manifest -'),
+    avoiding a temp-file round trip through the filesystem.
     """
-    tmp_path = None
-    try:
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as tmp:
-            json.dump(manifest, tmp)
-            tmp_path = tmp.name
-
-        args = ["apply", "--manifest", tmp_path]
-        if dry_run:
-            args.append("--dry-run")
-
-        return run_txed_command(args)
-    finally:
-        if tmp_path:
-            try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass
+    args = ["apply", "--manifest", "-"]
+    if dry_run:
+        args.append("--dry-run")
+
+    return await run_txed_command(args, input_data=_dumps(manifest))
 
 
 if __name__ == "__main__":
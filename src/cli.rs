@@ -324,7 +324,7 @@ pub struct DefaultArgs {
 /// Arguments for the 'apply' subcommand.
 #[derive(Args, Debug)]
 pub struct ApplyArgs {
-    /// JSON manifest file specifying transformations.
+    /// JSON manifest file specifying transformations. Use '-' to read it from stdin.
     #[arg(short, long, value_name = "FILE")]
     pub manifest: PathBuf,
 
@@ -1,7 +1,7 @@
 use anyhow::{bail, Context, Result};
 use clap::Parser;
 use std::fs;
-use std::io::IsTerminal;
+use std::io::{IsTerminal, Read};
 
 use crate::cli::{Cli, Commands, DefaultArgs, OutputFormat, PermissionsMode as CliPermissionsMode};
 use crate::input::{InputItem, InputMode};
@@ -110,6 +110,22 @@ fn try_main() -> Result<i32> {
     // Determine the actual args to use, preferring manifest-specific overrides
     let args = default_args;
 
+    // Read the manifest up front. `--manifest -` streams it from stdin,
+    // so it must be consumed before stdin is considered for path input.
+    let manifest_content = match &manifest_path {
+        Some(path) if path.as_os_str() == "-" => {
+            let mut buf = String::new();
+            std::io::stdin()
+                .read_to_string(&mut buf)
+                .context("reading manifest from stdin")?;
+            Some(buf)
+        }
+        Some(path) => {
+            Some(fs::read_to_string(path).context(format!("reading manifest from {:?}", path))?)
+        }
+        None => None,
+    };
+
     // Resolve input mode
     let mode = input::resolve_input_mode(
         args.stdin_paths,
@@ -149,10 +165,8 @@ fn try_main() -> Result<i32> {
     };
 
     // 2. Build Pipeline
-    let pipeline = if let Some(path) = &manifest_path {
-        let content =
-            fs::read_to_string(path).context(format!("reading manifest from {:?}", path))?;
-        let mut p: Pipeline = serde_json::from_str(&content).context("parsing manifest")?;
+    let pipeline = if let Some(content) = &manifest_content {
+        let mut p: Pipeline = serde_json::from_str(content).context("parsing manifest")?;
 
         // Apply CLI overrides if present
         if args.dry_run {
@@ -91,3 +91,39 @@ fn test_manifest_transaction_override() {
     let run_start = &events[0]["run_start"];
     assert_eq!(run_start["transaction_mode"], "all");
 }
+
+#[test]
+fn test_manifest_from_stdin() {
+    let temp_dir = TempDir::new().unwrap();
+    let file_path = temp_dir.path().join("foo.txt");
+    fs::write(&file_path, "hello world").unwrap();
+
+    // `--manifest -` reads the manifest from stdin instead of a file
+    let manifest = serde_json::json!({
+        "files": [file_path.to_str().unwrap()],
+        "operations": [
+            {
+                "type": "replace",
+                "find": "world",
+                "with": "universe"
+            }
+        ]
+    });
+
+    let mut cmd = cargo_bin_cmd!("txed");
+    let output = cmd
+        .arg("apply")
+        .arg("--manifest")
+        .arg("-")
+        .arg("--format=json")
+        .write_stdin(manifest.to_string())
+        .output()
+        .unwrap();
+
+    if !output.status.success() {
+        eprintln!("TXED Failed: {}", String::from_utf8_lossy(&output.stderr));
+        panic!("Command failed");
+    }
+
+    assert_eq!(fs::read_to_string(&file_path).unwrap(), "hello universe");
+}